@@ -6,9 +6,170 @@ Returns a list of job dictionaries with title, company, location, short_descript
 """
 
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
+from typing import List, Dict, Set, Tuple
+import logging
+import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("jobhunter")
+
+# Shared HTTP session: keeps connections to jobindex.dk alive between queries/endpoints
+# so only the first request pays for the TCP+TLS handshake. Responses are cached on disk
+# for 10 minutes, so repeated runs within that window don't hit Jobindex at all.
+_SESSION = requests_cache.CachedSession(
+    '.cache/jobindex',
+    backend='sqlite',
+    expire_after=600,
+    allowable_methods=['GET'],
+    stale_if_error=True,
+)
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504]),
+))
+_SESSION.headers.update({
+    "User-Agent": "JobHunter/1.0 (+https://github.com)"
+})
+
+# Only materialize nodes that can hold a job listing (see selectors below) or a job link;
+# everything else on the page (navigation, ads, scripts) is skipped while parsing.
+_JOB_CLASS_RE = re.compile(r'job|result|listing')
+_JOB_HREF_RE = re.compile(r'/job/')
+
+
+def _is_job_node(name: str, attrs: Dict[str, str]) -> bool:
+    if name == 'a':
+        return bool(_JOB_HREF_RE.search(attrs.get('href') or ''))
+    if name in ('article', 'div', 'li'):
+        return bool(_JOB_CLASS_RE.search(attrs.get('class') or ''))
+    return False
+
+
+_JOB_STRAINER = SoupStrainer(_is_job_node)
+
+# CSS selectors are compiled once here and reused for every page and element.
+# Listing patterns (these may change if Jobindex updates HTML) are unioned so the page
+# is walked once instead of once per pattern.
+_JOB_LIST = sv.compile(', '.join((
+    # Common article/listing patterns
+    'article.job-result',     # article elements with job-result
+    'article.job-item',       # article with job-item
+    'div.job-listing',        # div with job-listing
+    'li.job',                 # list items with job
+    'div.job',                # generic div.job
+)))
+_JOB_LINK = sv.compile('a[href*="/job/"]')
+_COMPANY = sv.compile('.company, .job-company, span.company, .company-name')
+_LOCATION = sv.compile('.location, .job-location, span.location')
+_DESC = sv.compile('.job-summary, .description, .teaser, .job__excerpt')
+
+# Relative job links are resolved against this base
+_BASE = 'https://www.jobindex.dk'
+_ABS_PREFIXES = ('http://', 'https://')
+
+
+def _parse_page(resp: requests.Response, limit: int) -> List[Dict]:
+    """
+    Parse one Jobindex search results page into job dictionaries, in page order.
+    Malformed entries are skipped; duplicates across pages are left to the caller.
+    At most `limit` unique jobs are extracted; it also bounds the anchor-fallback candidates.
+    """
+    # Decode with the charset from the Content-Type header when the server sends one,
+    # so BeautifulSoup doesn't have to sniff (or guess) the encoding of every page
+    declared = 'charset' in resp.headers.get('Content-Type', '').lower()
+    encoding = resp.encoding if declared else None
+    soup = BeautifulSoup(resp.content, 'lxml', parse_only=_JOB_STRAINER, from_encoding=encoding)
+
+    # Match all listing patterns in one pass (see _JOB_LIST). Containers nesting other
+    # matches resolve to the same job URL and are dropped by the caller's dedup.
+    job_elements = _JOB_LIST.select(soup)
+
+    # If still nothing, try to find anchors that look like job links and use their parents.
+    # The strainer drops containers the listing selectors don't know, which would leave the
+    # anchors without the company/location around them, so this path parses the full page.
+    # Parents shared by several anchors are visited once, and the candidate pool is capped so
+    # a dense page doesn't cost O(anchors) selector calls.
+    if not job_elements:
+        soup = BeautifulSoup(resp.content, 'lxml', from_encoding=encoding)
+        seen_parents = set()
+        for a in _JOB_LINK.select(soup):
+            p = a.parent
+            if p is None:
+                continue
+            if id(p) in seen_parents:
+                continue
+            seen_parents.add(id(p))
+            job_elements.append(p)
+            if len(job_elements) >= limit * 3:
+                break
+
+    page_jobs: List[Dict] = []
+    seen_hashes: Set[int] = set()
+    for elem in job_elements:
+        if len(page_jobs) >= limit:
+            break
+        try:
+            # Title: prefer anchor with job link
+            a = elem if elem.name == 'a' else (_JOB_LINK.select_one(elem) or elem.find('a'))
+            if not a:
+                continue
+            href = a.get('href', '').strip()
+            if not href:
+                continue
+            url_abs = href if href.startswith(_ABS_PREFIXES) else _BASE + href
+
+            # Skip repeats (e.g. nested listing containers) before paying for any text extraction
+            url_hash = hash(url_abs)
+            if url_hash in seen_hashes:
+                continue
+            seen_hashes.add(url_hash)
+
+            title = a.get_text(strip=True)
+
+            # Company selector(s): .company, .job-company, span.company
+            company_elem = _COMPANY.select_one(elem)
+            company = company_elem.get_text(strip=True) if company_elem else ""
+
+            # Location selector(s): .location, .job-location, span.location
+            loc_elem = _LOCATION.select_one(elem)
+            location = loc_elem.get_text(strip=True) if loc_elem else ""
+
+            # Short description: .job-summary, .description, .teaser
+            desc_elem = _DESC.select_one(elem)
+            short_desc = desc_elem.get_text(strip=True)[:300] if desc_elem else ""
+
+            page_jobs.append({
+                "job_title": title or "Unknown",
+                "company": company or "Unknown",
+                "location": location or "Unknown",
+                "short_description": short_desc,
+                "url": url_abs
+            })
+
+        except Exception as e:
+            # Skip malformed entries but keep the scrape running
+            logger.warning("Warning: could not parse a job element: %s", e)
+            continue
+
+    return page_jobs
+
+
+def _fetch_page(url: str, params: Dict[str, str], limit: int) -> List[Dict]:
+    """
+    Fetch and parse one search page. Runs in a worker thread, so parsing of one page
+    overlaps with the network round-trips of the others.
+    """
+    resp = _SESSION.get(url, params=params, timeout=10)
+    resp.raise_for_status()
+    return _parse_page(resp, limit)
 
 
 def fetch_jobindex_jobs(search_term: str = "IT drift", limit: int = 10) -> List[Dict]:
@@ -32,172 +193,131 @@ def fetch_jobindex_jobs(search_term: str = "IT drift", limit: int = 10) -> List[
     if search_term.strip().lower() == "it drift":
         queries = ["IT drift", "IT operations", "systemadministrator"]
 
-    headers = {
-        "User-Agent": "JobHunter/1.0 (+https://github.com)"
-    }
-
     jobs: List[Dict] = []
-    seen_urls = set()
-
-    for q in queries:
-        if len(jobs) >= limit:
-            break
-
-        # Try a couple of likely Jobindex search endpoints
-        endpoints = [
+    # Dedup on the 64-bit hash of each absolute URL rather than the URL string itself
+    seen_hashes: Set[int] = set()
+
+    # Try a couple of likely Jobindex search endpoints per query. All requests are issued
+    # in parallel up front; results are consumed below in submission order so the output
+    # is deterministic and we can stop as soon as `limit` jobs are collected.
+    tasks = [
+        (q, url, params)
+        for q in queries
+        for url, params in (
             ("https://www.jobindex.dk/jobsoegning", {"q": q}),
             ("https://www.jobindex.dk/jobs", {"query": q}),
-        ]
+        )
+    ]
 
-        queried = False
-        for url, params in endpoints:
-            try:
-                resp = requests.get(url, params=params, timeout=10, headers=headers)
-                resp.raise_for_status()
-                queried = True
-
-                soup = BeautifulSoup(resp.content, 'html.parser')
-
-                # Try several selectors (these may change if Jobindex updates HTML)
-                # Commented where each selector is used to extract elements.
-                selectors = [
-                    # Common article/listing patterns
-                    'article.job-result',     # article elements with job-result
-                    'article.job-item',       # article with job-item
-                    'div.job-listing',        # div with job-listing
-                    'li.job',                 # list items with job
-                    'div.job',                # generic div.job
-                ]
-
-                job_elements = []
-                for sel in selectors:
-                    found = soup.select(sel)
-                    if found:
-                        job_elements = found
-                        break
+    executor = ThreadPoolExecutor(max_workers=len(tasks))
+    futures = [executor.submit(_fetch_page, url, params, limit) for _, url, params in tasks]
+
+    queried = set()
+    answered = set()
+    try:
+        for (q, url, params), future in zip(tasks, futures):
+            if len(jobs) >= limit:
+                break
+            # If an earlier endpoint already returned results for this query, skip the next one
+            if q in answered:
+                continue
 
-                # If still nothing, try to find anchors that look like job links and use their parents
-                if not job_elements:
-                    anchors = soup.select('a[href*="/job/"]')
-                    job_elements = [a.parent for a in anchors if a and a.parent]
+            try:
+                page_jobs = future.result()
+                queried.add(q)
 
-                for elem in job_elements:
+                for job in page_jobs:
                     if len(jobs) >= limit:
                         break
-                    try:
-                        # Title: prefer anchor with job link
-                        a = elem.select_one('a[href*="/job/"]') or elem.find('a')
-                        if not a:
-                            continue
-                        href = a.get('href', '').strip()
-                        if not href:
-                            continue
-                        url_abs = href if href.startswith('http') else 'https://www.jobindex.dk' + href
-
-                        if url_abs in seen_urls:
-                            continue
-
-                        title = a.get_text(strip=True)
-
-                        # Company selector(s): .company, .job-company, span.company
-                        company_elem = elem.select_one('.company, .job-company, span.company, .company-name')
-                        company = company_elem.get_text(strip=True) if company_elem else ""
-
-                        # Location selector(s): .location, .job-location, span.location
-                        loc_elem = elem.select_one('.location, .job-location, span.location')
-                        location = loc_elem.get_text(strip=True) if loc_elem else ""
-
-                        # Short description: .job-summary, .description, .teaser
-                        desc_elem = elem.select_one('.job-summary, .description, .teaser, .job__excerpt')
-                        short_desc = desc_elem.get_text(strip=True)[:300] if desc_elem else ""
-
-                        job = {
-                            "job_title": title or "Unknown",
-                            "company": company or "Unknown",
-                            "location": location or "Unknown",
-                            "short_description": short_desc,
-                            "url": url_abs
-                        }
-
-                        jobs.append(job)
-                        seen_urls.add(url_abs)
-
-                    except Exception as e:
-                        # Skip malformed entries but keep the scrape running
-                        print(f"Warning: could not parse a job element: {e}", file=sys.stderr)
+                    url_hash = hash(job["url"])
+                    if url_hash in seen_hashes:
                         continue
+                    jobs.append(job)
+                    seen_hashes.add(url_hash)
 
                 # If we found some results on this endpoint, no need to try the next endpoint for the same query
-                if job_elements:
-                    break
+                if page_jobs:
+                    answered.add(q)
 
             except requests.exceptions.RequestException as e:
                 # Network-level error for this endpoint (e.g., 404). Log to stderr and return an empty list
                 # so the caller can fall back to sample jobs. Do not let the exception bubble up and crash.
-                print(f"Error fetching Jobindex for query '{q}' from '{url}': {e}", file=sys.stderr)
+                logger.warning("Error fetching Jobindex for query '%s' from '%s': %s", q, url, e)
                 return []
             except Exception as e:
                 # Any other parsing error shouldn't crash the program
-                print(f"Error parsing Jobindex results for query '{q}': {e}", file=sys.stderr)
+                logger.warning("Error parsing Jobindex results for query '%s': %s", q, e)
                 continue
+    finally:
+        # Don't wait for requests whose results are no longer needed
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        if not queried:
-            print(f"Warning: No successful request performed for query '{q}'", file=sys.stderr)
+    if len(jobs) < limit:
+        for q in queries:
+            if q not in queried:
+                logger.warning("Warning: No successful request performed for query '%s'", q)
 
     if not jobs:
         # Clear, human-friendly message and empty return so the caller will use sample jobs as fallback
-        print("Could not fetch or parse Jobindex results; using sample jobs as fallback", file=sys.stderr)
+        logger.warning("Could not fetch or parse Jobindex results; using sample jobs as fallback")
         return []
 
     # Limit to the requested amount and return
     return jobs[:limit]
 
 
+# Sample job data used when scraping fails, built once at import
+_SAMPLE_JOBS: Tuple[Dict[str, str], ...] = (
+    {
+        "job_title": "IT Drift Specialist",
+        "company": "Tech Company A",
+        "location": "København",
+        "short_description": "Vi søger en erfaren IT drift specialist til at varetage systems administration og overvågning af vores infrastruktur.",
+        "url": "https://www.jobindex.dk/jobs/1"
+    },
+    {
+        "job_title": "Systems Administrator",
+        "company": "Enterprise Corp",
+        "location": "Aarhus",
+        "short_description": "Du vil få ansvar for daglig drift og vedligeholdelse af serverpark samt support til brugere.",
+        "url": "https://www.jobindex.dk/jobs/2"
+    },
+    {
+        "job_title": "Help Desk Support",
+        "company": "Service Center",
+        "location": "Odense",
+        "short_description": "Vi har brug for supportmedarbejder til at håndtere bruger-henvendelser via telefon og mail.",
+        "url": "https://www.jobindex.dk/jobs/3"
+    },
+    {
+        "job_title": "Cloud Infrastructure Engineer",
+        "company": "Digital Solutions",
+        "location": "København",
+        "short_description": "Søger erfaren engineer til setup og drift af AWS/Azure infrastructure samt CI/CD pipelines.",
+        "url": "https://www.jobindex.dk/jobs/4"
+    },
+    {
+        "job_title": "Junior Programmør",
+        "company": "StartUp Inc",
+        "location": "Frederiksberg",
+        "short_description": "Vi søger junior udvikler til Python og JavaScript udvikling af vores webapplikation.",
+        "url": "https://www.jobindex.dk/jobs/5"
+    }
+)
+
+
 def get_sample_jobs() -> List[Dict]:
     """
     Fallback: return sample job data if scraping fails.
     This ensures the pipeline can run even if Jobindex is unreachable.
+    Returns shallow copies so callers may modify the dictionaries.
     """
-    return [
-        {
-            "job_title": "IT Drift Specialist",
-            "company": "Tech Company A",
-            "location": "København",
-            "short_description": "Vi søger en erfaren IT drift specialist til at varetage systems administration og overvågning af vores infrastruktur.",
-            "url": "https://www.jobindex.dk/jobs/1"
-        },
-        {
-            "job_title": "Systems Administrator",
-            "company": "Enterprise Corp",
-            "location": "Aarhus",
-            "short_description": "Du vil få ansvar for daglig drift og vedligeholdelse af serverpark samt support til brugere.",
-            "url": "https://www.jobindex.dk/jobs/2"
-        },
-        {
-            "job_title": "Help Desk Support",
-            "company": "Service Center",
-            "location": "Odense",
-            "short_description": "Vi har brug for supportmedarbejder til at håndtere bruger-henvendelser via telefon og mail.",
-            "url": "https://www.jobindex.dk/jobs/3"
-        },
-        {
-            "job_title": "Cloud Infrastructure Engineer",
-            "company": "Digital Solutions",
-            "location": "København",
-            "short_description": "Søger erfaren engineer til setup og drift af AWS/Azure infrastructure samt CI/CD pipelines.",
-            "url": "https://www.jobindex.dk/jobs/4"
-        },
-        {
-            "job_title": "Junior Programmør",
-            "company": "StartUp Inc",
-            "location": "Frederiksberg",
-            "short_description": "Vi søger junior udvikler til Python og JavaScript udvikling af vores webapplikation.",
-            "url": "https://www.jobindex.dk/jobs/5"
-        }
-    ]
+    return [dict(job) for job in _SAMPLE_JOBS]
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper(), stream=sys.stderr, format="%(message)s")
+
     # Test the scraper
     jobs = fetch_jobindex_jobs()
     if not jobs:
@@ -5,13 +5,21 @@ Main orchestrator for the JobHunter AI job agent.
 Fetches jobs, evaluates them using MCP prompt, and outputs JSON results.
 """
 
+import asyncio
+import functools
 import json
+import logging
 import os
+import re
 import sys
+import time
 import hashlib
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional
 
-from openai import OpenAI
+import diskcache
+import msgspec
+import orjson
+from openai import AsyncOpenAI, DefaultAioHttpClient, APIStatusError, RateLimitError
 
 # The OpenAI API key is expected via the OPENAI_API_KEY environment variable
 # (for example from a .env file mounted by docker-compose)
@@ -19,24 +27,235 @@ from openai import OpenAI
 # Import the job fetcher
 from fetch_jobs import fetch_jobindex_jobs, get_sample_jobs
 
+logger = logging.getLogger("jobhunter")
 
-def evaluate_job_with_mcp(job: Dict[str, str]) -> Dict[str, Any]:
+
+class Evaluation(msgspec.Struct):
     """
-    Evaluate a job using the evaluate_job.mcp prompt via OpenAI MCP.
-    
-    Args:
-        job: Dictionary with job_title, company, location, and url
-        
-    Returns:
-        Dictionary with evaluation results: relevant, score, category, reason
+    Evaluation object returned by the model (see OUTPUT in evaluate_job.mcp).
+    """
+    relevant: bool
+    score: float
+    category: str
+    reason: str
+
+
+class _BatchEvaluation(Evaluation):
+    # Position of the job in the batch input, echoed back by the model
+    id: Optional[int] = None
+
+
+# Typed decoder validating single-job replies while parsing them; streamed batch items are
+# validated one at a time with msgspec.convert (see evaluate_batch_with_mcp_async)
+_EVALUATION_DECODER = msgspec.json.Decoder(Evaluation)
+
+# JSON schemas for structured outputs: the model can only produce objects with exactly these
+# fields and types, so there are no missing keys or stray categories to handle downstream
+_EVALUATION_PROPERTIES = {
+    "relevant": {"type": "boolean"},
+    "score": {"type": "number"},
+    "category": {"type": "string", "enum": ["IT-drift", "Drift", "Support", "Other"]},
+    "reason": {"type": "string"},
+}
+
+_EVALUATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evaluation",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": _EVALUATION_PROPERTIES,
+            "required": list(_EVALUATION_PROPERTIES),
+            "additionalProperties": False,
+        },
+    },
+}
+
+_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "evaluation_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "evaluations": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "integer"}, **_EVALUATION_PROPERTIES},
+                        "required": ["id", *_EVALUATION_PROPERTIES],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["evaluations"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class _EvaluationStream:
+    """
+    Incrementally extracts complete objects from the "evaluations" array of a streamed
+    batch reply, so each evaluation can be used as soon as its closing brace arrives.
+    """
+    _ARRAY_START = re.compile(r'"evaluations"\s*:\s*\[')
+    _SEPARATOR = re.compile(r'[\s,]*')
+    # orjson has no raw_decode, which is what lets us parse one object out of a longer buffer
+    _DECODER = json.JSONDecoder()
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = None
+
+    def feed(self, text: str) -> List[Any]:
+        self._buf += text
+        if self._pos is None:
+            m = self._ARRAY_START.search(self._buf)
+            if not m:
+                return []
+            self._pos = m.end()
+
+        objects = []
+        while True:
+            self._pos = self._SEPARATOR.match(self._buf, self._pos).end()
+            if self._buf[self._pos:self._pos + 1] != "{":
+                return objects
+            try:
+                obj, self._pos = self._DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Object not complete yet; wait for more content
+                return objects
+            objects.append(obj)
+
+
+# Model used for all evaluations
+MODEL = "gpt-4o-mini"
+
+# Maximum number of OpenAI requests in flight at the same time
+MAX_CONCURRENCY = int(os.getenv("JOBHUNTER_CONCURRENCY", "8"))
+
+# New jobs are appended to data/jobs.ndjson; once it holds this many entries it is folded
+# into the data/jobs.json snapshot, so a run only writes the jobs it added
+COMPACT_THRESHOLD = 200
+
+# Per-minute request and token budgets of the OpenAI project (gpt-4o-mini, usage tier 1 by
+# default). Requests are metered against them up front instead of running into 429s.
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+
+# Retries (with the SDK's exponential backoff) for 429s and transient errors that still happen
+MAX_RETRIES = 5
+
+# Number of jobs evaluated in a single chat completion, so the system prompt is sent
+# (and billed) once per batch instead of once per job
+BATCH_SIZE = 5
+
+# Appended to the MCP prompt for batched requests; the per-job output format stays the same
+_BATCH_INSTRUCTIONS = """
+
+---
+
+BATCH-INPUT:
+Du modtager en JSON-liste med flere job (hvert med id, job_title, company, location og job_description).
+Vurdér hvert job for sig efter kriterierne ovenfor og returnér KUN gyldig JSON i dette format:
+{"evaluations": [ét objekt pr. job i OUTPUT-formatet ovenfor plus jobbets "id", i samme rækkefølge som input]}
+"""
+
+# Evaluations are cached on disk by (model, system prompt, job content) for a week, so
+# re-running with unchanged jobs or prompt doesn't pay for the same OpenAI call twice
+_eval_cache = diskcache.Cache('.cache/evals')
+EVAL_CACHE_TTL = 7 * 86400
+
+
+class _RateLimiter:
+    """
+    Token bucket metering requests and tokens against per-minute budgets.
+    Both buckets refill continuously; acquire() waits until the next request fits in both.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self._rpm = rpm
+        self._tpm = tpm
+        self._requests_available = float(rpm)
+        self._tokens_available = float(tpm)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self._requests_available = min(self._rpm, self._requests_available + elapsed * self._rpm / 60)
+        self._tokens_available = min(self._tpm, self._tokens_available + elapsed * self._tpm / 60)
+
+    async def acquire(self, tokens: int) -> None:
+        # A request larger than the whole budget would never fit; let it through once the bucket is full
+        tokens = min(tokens, self._tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests_available >= 1 and self._tokens_available >= tokens:
+                    self._requests_available -= 1
+                    self._tokens_available -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests_available) * 60 / self._rpm,
+                    (tokens - self._tokens_available) * 60 / self._tpm,
+                )
+                await asyncio.sleep(wait)
+
+
+def _estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    Rough upper bound on the tokens a request counts against the TPM budget
+    (about four characters per prompt token, plus the completion limit).
+    """
+    return sum(len(m["content"]) for m in messages) // 4 + max_tokens
+
+
+@functools.lru_cache(maxsize=1)
+def _mcp_system_prompt() -> str:
+    """
+    Read the MCP system prompt, preferring the copy baked into the Docker image.
+    The file doesn't change during a run, so it is read only once per process.
+    """
+    mcp_path = "/app/evaluate_job.mcp"
+    if not os.path.exists(mcp_path):
+        mcp_path = "evaluate_job.mcp"
+
+    with open(mcp_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _openai_credentials() -> Dict[str, str]:
+    """
+    Fetch OpenAI credentials from environment.
+    Support for project-based API keys (sk-proj-...); OPENAI_PROJECT_ID is optional.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY not set")
+
+    kwargs = {"api_key": api_key}
+    # The project parameter ensures API calls use the correct project context
+    project_id = os.getenv("OPENAI_PROJECT_ID")
+    if project_id:
+        kwargs["project"] = project_id
+    return kwargs
+
+
+def _build_prompt(job: Dict[str, str]) -> str:
+    """
+    Format the user message describing a single job posting.
     """
-    
     # Prepare the job description from the job data
     job_description = f"{job.get('short_description', '')}"
-    
-    # Create the prompt for MCP
-    # Since we're using MCP client, we'll format a request
-    prompt = f"""
+
+    return f"""
 Evaluate this job posting:
 
 job_title: {job.get('job_title', '')}
@@ -44,146 +263,371 @@ company: {job.get('company', '')}
 location: {job.get('location', '')}
 job_description: {job_description}
 """
-    
+
+
+@functools.lru_cache(maxsize=4)
+def _system_message(system_prompt: str) -> Dict[str, str]:
+    # The system prompt is the same for every job, so its message is built only once
+    return {
+        "role": "system",
+        "content": system_prompt
+    }
+
+
+def _build_messages(system_prompt: str, job: Dict[str, str]) -> List[Dict[str, str]]:
+    return [
+        _system_message(system_prompt),
+        {
+            "role": "user",
+            "content": _build_prompt(job)
+        }
+    ]
+
+
+@functools.lru_cache(maxsize=4)
+def _prompt_hash(system_prompt: str) -> str:
+    # Hashing the (multi-kilobyte) prompt once instead of for every cache lookup
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+
+
+def _eval_cache_key(system_prompt: str, job: Dict[str, str]) -> str:
+    """
+    Content-addressed cache key: only the fields that end up in the prompt are hashed.
+    """
+    prompt_hash = _prompt_hash(system_prompt)
+    job_fields = {k: job.get(k, '') for k in ("job_title", "company", "location", "short_description")}
+    key = f"{MODEL}|{prompt_hash}|".encode('utf-8') + orjson.dumps(job_fields, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def _parse_evaluation(response_text: str, cache_key: str) -> Dict[str, Any]:
+    """
+    Parse the evaluation JSON object returned by the model (requested with _EVALUATION_FORMAT).
+    Successfully parsed evaluations are stored in the evaluation cache under `cache_key`.
+    """
     try:
-        # Call OpenAI API with the MCP system prompt
-        # Read the MCP prompt
-        mcp_path = "/app/evaluate_job.mcp"
-        if not os.path.exists(mcp_path):
-            mcp_path = "evaluate_job.mcp"
-        
-        with open(mcp_path, 'r', encoding='utf-8') as f:
-            mcp_system_prompt = f.read()
-        
-        # Fetch OpenAI credentials from environment
-        # Support for project-based API keys (sk-proj-...)
-        api_key = os.getenv("OPENAI_API_KEY")
-        project_id = os.getenv("OPENAI_PROJECT_ID")
-        
-        if not api_key or not project_id:
-            raise RuntimeError("OPENAI_API_KEY or OPENAI_PROJECT_ID not set")
-        
-        # Initialize OpenAI client with project-based API key
-        # The project parameter ensures API calls use the correct project context
-        client = OpenAI(
-            api_key=api_key,
-            project=project_id
-        )
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": mcp_system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        # Parse the response
-        response_text = response.choices[0].message.content.strip()
-        
-        # Try to extract JSON from the response
-        try:
-            # Find JSON in the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                evaluation = json.loads(json_str)
-            else:
-                # Fallback: create minimal evaluation
-                evaluation = {
-                    "relevant": False,
-                    "score": 0.0,
-                    "category": "Other",
-                    "reason": "Could not parse evaluation"
-                }
-        except json.JSONDecodeError:
-            # Fallback: create minimal evaluation
-            evaluation = {
-                "relevant": False,
-                "score": 0.0,
-                "category": "Other",
-                "reason": "Invalid JSON in response"
-            }
-        
-        return evaluation
-    
-    except Exception as e:
-        # 429 håndteres særskilt så vi logger en klar besked, returnerer en eksplicit "quota exceeded" evaluation
-        # og fortsætter til næste job i køen uden at afslutte hele processen.
-        err_str = str(e).lower()
-        err_code = None
-        # Nogle OpenAI-klientfejl eksponerer status/kode på forskellige attributter
-        for attr in ("status", "status_code", "http_status", "code"):
-            if hasattr(e, attr):
-                try:
-                    val = getattr(e, attr)
-                    if isinstance(val, int) and val == 429:
-                        err_code = 429
-                        break
-                    if isinstance(val, str) and val.isdigit() and int(val) == 429:
-                        err_code = 429
-                        break
-                except Exception:
-                    pass
-
-        if "429" in err_str or "insufficient_quota" in err_str or err_code == 429:
-            # Menneskelig venlig logbesked for quota-problemer
-            print("OpenAI quota exceeded – check billing for project", file=sys.stderr)
-            # Returnér klart signal i evaluation så downstream kan skelne denne fejl
-            return {
-                "relevant": False,
-                "score": 0.0,
-                "category": "Other",
-                "reason": "OpenAI quota exceeded"
-            }
-
-        # Fallback: behold eksisterende generiske fejl-output for andre fejl
-        print(f"Error evaluating job: {e}", file=sys.stderr)
-        # Return neutral evaluation on error
+        evaluation = msgspec.structs.asdict(_EVALUATION_DECODER.decode(response_text))
+    except msgspec.DecodeError:
+        # Structured outputs guarantee a matching object unless the output was cut off
+        # (e.g. max_tokens) or the model refused
         return {
             "relevant": False,
             "score": 0.0,
             "category": "Other",
-            "reason": f"Evaluation error: {str(e)}"
+            "reason": "Invalid JSON in response"
         }
 
+    _eval_cache.set(cache_key, evaluation, expire=EVAL_CACHE_TTL)
+    return evaluation
+
 
-def create_output_object(job: Dict[str, str], evaluation: Dict[str, Any]) -> Dict[str, Any]:
+def _error_evaluation(e: Exception) -> Dict[str, Any]:
     """
-    Create the final output object combining job and evaluation data.
-    
+    Map an exception raised while evaluating a job to a neutral evaluation.
+    """
+    # 429 håndteres særskilt så vi logger en klar besked, returnerer en eksplicit "quota exceeded" evaluation
+    # og fortsætter til næste job i køen uden at afslutte hele processen.
+    # SDK'et rejser typede fejl med status_code, så ingen grund til at gætte ud fra teksten.
+    if isinstance(e, RateLimitError) or (isinstance(e, APIStatusError) and e.status_code == 429):
+        # Menneskelig venlig logbesked for quota-problemer
+        logger.warning("OpenAI quota exceeded – check billing for project")
+        # Returnér klart signal i evaluation så downstream kan skelne denne fejl
+        return {
+            "relevant": False,
+            "score": 0.0,
+            "category": "Other",
+            "reason": "OpenAI quota exceeded"
+        }
+
+    # Fallback: behold eksisterende generiske fejl-output for andre fejl
+    logger.warning("Error evaluating job: %s", e)
+    # Return neutral evaluation on error
+    return {
+        "relevant": False,
+        "score": 0.0,
+        "category": "Other",
+        "reason": f"Evaluation error: {str(e)}"
+    }
+
+
+async def evaluate_job_with_mcp_async(
+    client: AsyncOpenAI,
+    system_prompt: str,
+    job: Dict[str, str],
+    sem: asyncio.Semaphore,
+    limiter: _RateLimiter,
+) -> Dict[str, Any]:
+    """
+    Evaluate a job using the evaluate_job.mcp prompt, sharing one client and system prompt across jobs.
+
     Args:
-        job: Job dictionary from fetch_jobs.py
-        evaluation: Evaluation dictionary from MCP
-        
+        client: Shared AsyncOpenAI client
+        system_prompt: Contents of evaluate_job.mcp
+        job: Dictionary with job_title, company, location, and url
+        sem: Semaphore bounding the number of concurrent requests
+        limiter: Shared per-minute request/token budget
+
     Returns:
-        Combined output dictionary
+        Dictionary with evaluation results: relevant, score, category, reason
     """
-    return {
+    try:
+        cache_key = _eval_cache_key(system_prompt, job)
+        cached = _eval_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        messages = _build_messages(system_prompt, job)
+        async with sem:
+            await limiter.acquire(_estimate_tokens(messages, 500))
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=500,
+                response_format=_EVALUATION_FORMAT
+            )
+
+        # Parse the response
+        return _parse_evaluation(response.choices[0].message.content, cache_key)
+
+    except Exception as e:
+        return _error_evaluation(e)
+
+
+async def evaluate_batch_with_mcp_async(
+    client: AsyncOpenAI,
+    system_prompt: str,
+    jobs: List[Dict[str, str]],
+    sem: asyncio.Semaphore,
+    limiter: _RateLimiter,
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate several jobs with a single streamed chat completion.
+    Cached evaluations are reused. Evaluations are matched back to their jobs by the echoed
+    id as soon as each one is complete in the stream; jobs the batch response doesn't cover
+    are evaluated one at a time instead.
+
+    Args:
+        client: Shared AsyncOpenAI client
+        system_prompt: Contents of evaluate_job.mcp
+        jobs: Job dictionaries to evaluate together
+        sem: Semaphore bounding the number of concurrent requests
+        limiter: Shared per-minute request/token budget
+        on_result: Called with (index in `jobs`, evaluation) as soon as each evaluation is final
+
+    Returns:
+        Evaluations in the same order as `jobs`
+    """
+    evaluations: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+    def resolve(i: int, evaluation: Dict[str, Any]) -> None:
+        evaluations[i] = evaluation
+        if on_result is not None:
+            on_result(i, evaluation)
+
+    cache_keys = [_eval_cache_key(system_prompt, job) for job in jobs]
+    pending = []
+    for i, key in enumerate(cache_keys):
+        cached = _eval_cache.get(key)
+        if cached is None:
+            pending.append(i)
+        else:
+            resolve(i, cached)
+
+    if len(pending) == 1:
+        i = pending[0]
+        resolve(i, await evaluate_job_with_mcp_async(client, system_prompt, jobs[i], sem, limiter))
+        return evaluations
+    if not pending:
+        return evaluations
+
+    batch_input = [
+        {
+            "id": n,
+            "job_title": jobs[i].get('job_title', ''),
+            "company": jobs[i].get('company', ''),
+            "location": jobs[i].get('location', ''),
+            "job_description": jobs[i].get('short_description', ''),
+        }
+        for n, i in enumerate(pending)
+    ]
+
+    matched = set()
+    parser = _EvaluationStream()
+    position = 0
+    messages = [
+        {
+            "role": "system",
+            "content": system_prompt + _BATCH_INSTRUCTIONS
+        },
+        {
+            "role": "user",
+            "content": orjson.dumps(batch_input).decode()
+        }
+    ]
+    max_tokens = 500 * len(pending)
+    try:
+        async with sem:
+            await limiter.acquire(_estimate_tokens(messages, max_tokens))
+            stream = await client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=max_tokens,
+                response_format=_BATCH_FORMAT,
+                stream=True
+            )
+            async with stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    for obj in parser.feed(delta):
+                        try:
+                            ev = msgspec.convert(obj, _BatchEvaluation)
+                        except msgspec.ValidationError:
+                            continue
+                        finally:
+                            position += 1
+                        # Without an echoed id, rely on the input order
+                        n = ev.id if ev.id is not None else position - 1
+                        if n in matched or not 0 <= n < len(pending):
+                            continue
+                        matched.add(n)
+                        evaluation = {field: getattr(ev, field) for field in Evaluation.__struct_fields__}
+                        _eval_cache.set(cache_keys[pending[n]], evaluation, expire=EVAL_CACHE_TTL)
+                        resolve(pending[n], evaluation)
+                    if len(matched) == len(pending):
+                        # Everything we asked for is in; don't wait for the rest of the stream
+                        break
+    except Exception as e:
+        error = _error_evaluation(e)
+        for n, i in enumerate(pending):
+            if n not in matched:
+                resolve(i, dict(error))
+        return evaluations
+
+    missing = [i for n, i in enumerate(pending) if n not in matched]
+    if missing:
+        # The model didn't return an evaluation for every job; fall back to per-job requests
+        logger.warning("Batch response missed %d of %d jobs; evaluating them one by one", len(missing), len(pending))
+
+        async def evaluate_single(i: int) -> None:
+            resolve(i, await evaluate_job_with_mcp_async(client, system_prompt, jobs[i], sem, limiter))
+
+        await asyncio.gather(*(evaluate_single(i) for i in missing))
+
+    return evaluations
+
+
+def _fallback_id_key(job: Dict[str, str]) -> str:
+    # Identifies jobs without a URL
+    return f"{job.get('job_title','')}|{job.get('company','')}|{job.get('location','')}"
+
+
+def _job_id(id_key: str) -> str:
+    """
+    Stable id stored with each saved job: the hash of its URL, or of title|company|location.
+    """
+    return hashlib.blake2b(id_key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _append_jobs_log(log_path: str, jobs: List[Dict[str, Any]]) -> None:
+    """
+    Append jobs to the NDJSON log, one per line. A run interrupted mid-write can leave a
+    partial last line without its newline; it is terminated first so the new jobs start
+    on a line of their own and only the fragment is skipped on load.
+    """
+    with open(log_path, 'ab+') as f:
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(b"".join(orjson.dumps(j) + b"\n" for j in jobs))
+
+
+def _write_output(job: Dict[str, str], evaluation: Dict[str, Any]) -> None:
+    """
+    Write the job combined with its evaluation as a JSON line to stdout (UTF-8, no per-line flush).
+    """
+    sys.stdout.buffer.write(orjson.dumps({
         "job_title": job.get("job_title", ""),
         "company": job.get("company", ""),
         "location": job.get("location", ""),
         "url": job.get("url", ""),
         "evaluation": evaluation
-    }
+    }) + b"\n")
+
+
+async def evaluate_jobs(jobs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Evaluate jobs in batches of BATCH_SIZE, running at most MAX_CONCURRENCY requests at once.
+    Results are written as JSON lines to stdout as soon as each evaluation is complete.
+
+    Returns:
+        Evaluations in the same order as `jobs`
+    """
+    evaluations: List[Dict[str, Any]] = [None] * len(jobs)
+
+    try:
+        # Read the MCP prompt and build the client once for the whole run. The aiohttp
+        # transport keeps up under concurrent requests where the default httpx one stalls.
+        mcp_system_prompt = _mcp_system_prompt()
+        client = AsyncOpenAI(
+            **_openai_credentials(),
+            http_client=DefaultAioHttpClient(),
+            max_retries=MAX_RETRIES
+        )
+    except Exception as e:
+        # Without prompt or credentials no job can be evaluated; record the error for each of them
+        for i, job in enumerate(jobs):
+            evaluations[i] = _error_evaluation(e)
+            _write_output(job, evaluations[i])
+        sys.stdout.buffer.flush()
+        return evaluations
+
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = _RateLimiter(OPENAI_RPM, OPENAI_TPM)
+
+    def emit(i: int, evaluation: Dict[str, Any]) -> None:
+        evaluations[i] = evaluation
+        logger.info("Evaluated: %s (%s)", jobs[i].get('job_title', 'Unknown'), jobs[i].get('company', ''))
+
+        # Write the JSON result for the job to stdout as soon as it is known
+        _write_output(jobs[i], evaluation)
+        sys.stdout.buffer.flush()
+
+    async def evaluate(start: int) -> None:
+        batch = jobs[start:start + BATCH_SIZE]
+        try:
+            await evaluate_batch_with_mcp_async(
+                client, mcp_system_prompt, batch, sem, limiter,
+                on_result=lambda i, evaluation: emit(start + i, evaluation)
+            )
+        except Exception as e:
+            # An unexpected failure in one batch must not abort the others
+            error = _error_evaluation(e)
+            for i in range(start, start + len(batch)):
+                if evaluations[i] is None:
+                    emit(i, dict(error))
 
+    try:
+        await asyncio.gather(*(evaluate(start) for start in range(0, len(jobs), BATCH_SIZE)))
+    finally:
+        # Release the aiohttp session and its pooled connections
+        await client.close()
+
+    return evaluations
 
-def main():
+
+async def main():
     """
     Main entry point: fetch jobs, evaluate each one, output JSON.
     """
-    print("JobHunter - AI Job Agent", file=sys.stderr)
-    print("=" * 50, file=sys.stderr)
-    
+    logger.info("JobHunter - AI Job Agent")
+    logger.info("=" * 50)
+
     # Load settings (search terms, max jobs) from data/settings.json if present
     settings_defaults = {
         "search_terms": ["it drift", "systemadministrator", "it operations"],
@@ -196,22 +640,23 @@ def main():
     settings = settings_defaults
     try:
         if os.path.exists(settings_path):
-            with open(settings_path, 'r', encoding='utf-8') as f:
-                settings = json.load(f) or settings_defaults
+            with open(settings_path, 'rb') as f:
+                data = f.read()
+            settings = (orjson.loads(data) if data.strip() else None) or settings_defaults
         else:
             # Create settings file with defaults for user convenience
             os.makedirs(os.path.dirname(settings_path), exist_ok=True)
-            with open(settings_path, 'w', encoding='utf-8') as f:
-                json.dump(settings_defaults, f, ensure_ascii=False, indent=2)
+            with open(settings_path, 'wb') as f:
+                f.write(orjson.dumps(settings_defaults, option=orjson.OPT_INDENT_2))
     except Exception as e:
-        print(f"Error loading settings, using defaults: {e}", file=sys.stderr)
+        logger.warning("Error loading settings, using defaults: %s", e)
         settings = settings_defaults
 
     # Validate settings fields with safe fallbacks
     search_terms = settings.get('search_terms') if isinstance(settings.get('search_terms'), list) else settings_defaults['search_terms']
     max_jobs = settings.get('max_jobs') if isinstance(settings.get('max_jobs'), int) else settings_defaults['max_jobs']
 
-    print(f"Using settings: search_terms={search_terms}, max_jobs={max_jobs}", file=sys.stderr)
+    logger.info("Using settings: search_terms=%s, max_jobs=%s", search_terms, max_jobs)
 
     # Fetch jobs for each search term until we reach max_jobs
     jobs = []
@@ -224,7 +669,7 @@ def main():
                 jobs.extend(fetched)
         except Exception as e:
             # fetch_jobindex_jobs is expected to handle its own errors; log and continue
-            print(f"Error fetching jobs for term '{term}': {e}", file=sys.stderr)
+            logger.warning("Error fetching jobs for term '%s': %s", term, e)
             continue
 
     # Deduplicate by URL (basic) while preserving order
@@ -239,57 +684,96 @@ def main():
 
     # Fallback to sample data if scraping yields nothing
     if not jobs:
-        print("Using sample job data", file=sys.stderr)
+        logger.warning("Using sample job data")
         jobs = get_sample_jobs()
 
-    print(f"Found {len(jobs)} jobs", file=sys.stderr)
-    print("=" * 50, file=sys.stderr)
+    logger.info("Found %d jobs", len(jobs))
+    logger.info("=" * 50)
 
     # Ensure data directory exists and load existing saved jobs
     data_dir = os.path.join(os.getcwd(), 'data')
     os.makedirs(data_dir, exist_ok=True)
     data_path = os.path.join(data_dir, 'jobs.json')
+    log_path = os.path.join(data_dir, 'jobs.ndjson')
 
     existing_jobs = []
-    existing_by_id = {}
+    known_ids = set()
+    known_urls = set()
+    logged = 0
+    ids_updated = False
+
+    def remember(j):
+        # Register a saved job in the lookups; False if it is already known
+        nonlocal ids_updated
+        url = (j.get('url') or '').strip()
+        # compute stable id if missing, or if it is an old 64-char sha256 id;
+        # it is stored at the next compaction
+        if not j.get('id') or len(j['id']) == 64:
+            j['id'] = _job_id(url if url else _fallback_id_key(j))
+            ids_updated = True
+        if j['id'] in known_ids:
+            return False
+        known_ids.add(j['id'])
+        if url:
+            known_urls.add(url)
+        return True
+
     try:
+        # Snapshot first, then the jobs appended since the last compaction
         if os.path.exists(data_path):
-            with open(data_path, 'r', encoding='utf-8') as f:
-                existing_jobs = json.load(f) or []
-                # Build lookup by id (if entries don't have id, compute it)
-                for j in existing_jobs:
-                    jid = j.get('id')
-                    if not jid:
-                        # compute stable id if missing
-                        url = (j.get('url') or '').strip()
-                        key = url if url else f"{j.get('job_title','')}|{j.get('company','')}|{j.get('location','')}"
-                        jid = hashlib.sha256(key.encode('utf-8')).hexdigest()
-                        j['id'] = jid
-                    existing_by_id[jid] = j
+            with open(data_path, 'rb') as f:
+                data = f.read()
+            # An empty snapshot means no jobs, not an error
+            existing_jobs = [j for j in ((orjson.loads(data) if data.strip() else None) or []) if remember(j)]
+        if os.path.exists(log_path):
+            with open(log_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    logged += 1
+                    try:
+                        j = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A run interrupted mid-write can leave a partial last line
+                        logger.warning("Skipping invalid line in %s", log_path)
+                        continue
+                    if remember(j):
+                        existing_jobs.append(j)
     except Exception as e:
-        print(f"Error loading existing jobs: {e}", file=sys.stderr)
+        logger.warning("Error loading existing jobs: %s", e)
         existing_jobs = []
-        existing_by_id = {}
-
-    # Evaluate each job; skip duplicates based on stable id (hash of URL or fallback)
-    for i, job in enumerate(jobs, 1):
-        print(f"Evaluating job {i}/{len(jobs)}: {job.get('job_title', 'Unknown')}", file=sys.stderr)
-
-        # Generate stable ID (prefer URL, fallback to title|company|location)
+        known_ids = set()
+        known_urls = set()
+
+    # Skip duplicates before evaluating anything. Jobs with a URL are matched on the URL
+    # itself; only jobs without one need their hashed id to compare against saved jobs.
+    new_jobs_by_key = {}
+    for job in jobs:
+        # Stable id key (prefer URL, fallback to title|company|location)
         url = (job.get('url') or '').strip()
-        id_key = url if url else f"{job.get('job_title','')}|{job.get('company','')}|{job.get('location','')}"
-        job_id = hashlib.sha256(id_key.encode('utf-8')).hexdigest()
+        if url:
+            id_key = url
+            duplicate = url in known_urls
+        else:
+            id_key = _fallback_id_key(job)
+            duplicate = _job_id(id_key) in known_ids
 
-        if job_id in existing_by_id:
-            print(f"Duplicate job skipped: {job.get('job_title','Unknown')} ({job.get('company','')})", file=sys.stderr)
+        if duplicate or id_key in new_jobs_by_key:
+            logger.info("Duplicate job skipped: %s (%s)", job.get('job_title','Unknown'), job.get('company',''))
             continue
 
-        # New job — evaluate and save
-        evaluation = evaluate_job_with_mcp(job)
+        new_jobs_by_key[id_key] = job
+
+    logger.info("Evaluating %d new jobs", len(new_jobs_by_key))
 
+    # New jobs — evaluate concurrently and save
+    evaluations = await evaluate_jobs(list(new_jobs_by_key.values()))
+
+    new_saved_jobs = []
+    for (id_key, job), evaluation in zip(new_jobs_by_key.items(), evaluations):
         # Attach evaluation and id to saved job object
         saved_job = {
-            "id": job_id,
+            "id": _job_id(id_key),
             "job_title": job.get("job_title", ""),
             "company": job.get("company", ""),
             "location": job.get("location", ""),
@@ -298,24 +782,31 @@ def main():
             "evaluation": evaluation
         }
 
-        existing_jobs.append(saved_job)
-        existing_by_id[job_id] = saved_job
-        print(f"New job saved: {saved_job['job_title']} @ {saved_job['company']}", file=sys.stderr)
-
-        # Also print the JSON result for new job to stdout
-        print(json.dumps(create_output_object(job, evaluation), ensure_ascii=False))
+        new_saved_jobs.append(saved_job)
+        logger.info("New job saved: %s @ %s", saved_job['job_title'], saved_job['company'])
 
-    # After processing all jobs, write updated jobs list back to disk
+    # After processing all jobs, append the new ones to the log on disk
     try:
-        with open(data_path, 'w', encoding='utf-8') as f:
-            json.dump(existing_jobs, f, ensure_ascii=False, indent=2)
+        if new_saved_jobs:
+            _append_jobs_log(log_path, new_saved_jobs)
+            logged += len(new_saved_jobs)
+        existing_jobs.extend(new_saved_jobs)
+
+        if logged >= COMPACT_THRESHOLD or ids_updated:
+            # Rewrite the snapshot with everything, then start an empty log. The snapshot is
+            # replaced atomically; if we stop before truncating, duplicates are dropped on load.
+            tmp_path = data_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(existing_jobs, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, data_path)
+            open(log_path, 'wb').close()
     except Exception as e:
-        print(f"Error saving jobs to {data_path}: {e}", file=sys.stderr)
+        logger.warning("Error saving jobs to %s: %s", data_dir, e)
 
-    print(f"\nProcessed {len(jobs)} jobs", file=sys.stderr)
-    
-    print(f"\nProcessed {len(jobs)} jobs", file=sys.stderr)
+    logger.info("Processed %d jobs", len(jobs))
 
 
 if __name__ == "__main__":
-    main()
+    # Progress messages are logged at INFO; set LOG_LEVEL=INFO to see them
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper(), stream=sys.stderr, format="%(message)s")
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import orjson
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+import run  # noqa: E402
+
+
+def read_log(path):
+    with open(path, 'rb') as f:
+        return f.read().splitlines()
+
+
+def test_append_creates_log(tmp_path):
+    log_path = str(tmp_path / 'jobs.ndjson')
+    run._append_jobs_log(log_path, [{'id': 'a'}, {'id': 'b'}])
+    assert read_log(log_path) == [b'{"id":"a"}', b'{"id":"b"}']
+
+
+def test_append_after_partial_line_keeps_new_jobs(tmp_path):
+    log_path = tmp_path / 'jobs.ndjson'
+    # A run interrupted mid-write: one complete line plus a fragment without a newline
+    log_path.write_bytes(b'{"id":"a"}\n{"id":"b","job_ti')
+    run._append_jobs_log(str(log_path), [{'id': 'c'}])
+
+    lines = read_log(str(log_path))
+    assert lines == [b'{"id":"a"}', b'{"id":"b","job_ti', b'{"id":"c"}']
+    assert orjson.loads(lines[-1]) == {'id': 'c'}
+
+
+def test_append_after_complete_line_adds_no_blank_line(tmp_path):
+    log_path = tmp_path / 'jobs.ndjson'
+    log_path.write_bytes(b'{"id":"a"}\n')
+    run._append_jobs_log(str(log_path), [{'id': 'b'}])
+    assert log_path.read_bytes() == b'{"id":"a"}\n{"id":"b"}\n'
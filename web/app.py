@@ -1,11 +1,72 @@
-from flask import Flask, render_template_string, request, redirect, url_for
-import json
+from flask import Flask, Response, jsonify, render_template, request, redirect, stream_template, url_for
+import asyncio
+import hashlib
 import os
-import subprocess
 import sys
+import tempfile
+import threading
+from operator import itemgetter
+from types import MappingProxyType
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    # orjson is in requirements.txt; the stdlib parser keeps the UI working without it, only slower
+    import json
+
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+# The agent lives in src/ next to this package and imports its siblings as top-level modules
+AGENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
 
 app = Flask(__name__)
 
+# Static files are linked with a content hash (see static_cache_buster), so browsers may keep them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+
+# Data files shared with the agent, resolved once against the directory the app is started from
+DATA_DIR = os.path.join(os.getcwd(), 'data')
+JOBS_PATH = os.path.join(DATA_DIR, 'jobs.json')
+JOBS_LOG_PATH = os.path.join(DATA_DIR, 'jobs.ndjson')
+SETTINGS_PATH = os.path.join(DATA_DIR, 'settings.json')
+
+# Content hash per static file, keyed by the file's (mtime, size) so edits are picked up
+# without a restart (docker-compose mounts the source into the container)
+_static_hashes = {}
+
+# Static files linked from the dashboard; the cached page and its ETag depend on their versions
+DASHBOARD_ASSETS = ('style.css',)
+
+
+@app.url_defaults
+def static_cache_buster(endpoint, values):
+    # url_for('static', filename=...) gets ?v=<hash>, so a changed file gets a new URL
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    filename = values['filename']
+    path = os.path.join(app.static_folder, filename)
+    version = file_version(path)
+    cached = _static_hashes.get(filename)
+    if cached is None or cached[0] != version:
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=4).hexdigest()
+        except OSError:
+            digest = None
+        cached = (version, digest)
+        _static_hashes[filename] = cached
+    if cached[1]:
+        values['v'] = cached[1]
+
+
 # Simple HTML template for job listing with basic navigation and a button to trigger the agent
 TEMPLATE = """
 <!doctype html>
@@ -43,7 +104,7 @@ TEMPLATE = """
 
       <!-- Job cards -->
       {% for job in jobs %}
-      <div class="card {{ 'relevant' if job.evaluation.relevant else 'not-relevant' }}">
+      <div class="card {{ 'relevant' if job._relevant else 'not-relevant' }}">
 
         <div class="job-title">
           <a href="{{ job.url }}" target="_blank">
@@ -53,7 +114,7 @@ TEMPLATE = """
 
         <div class="job-meta">
           {{ job.company or '–' }} · {{ job.location or '–' }}
-          · <span class="score">Score {{ job.evaluation.score }}</span>
+          · <span class="score">Score {{ job._score_str }}</span>
         </div>
 
         <div class="job-reason">
@@ -68,20 +129,103 @@ TEMPLATE = """
 </html>
 """
 
+# Compiled once at import instead of re-parsed by render_template_string on every request.
+# Using the app's environment keeps url_for and the other template globals available.
+INDEX_TEMPLATE = app.jinja_env.from_string(TEMPLATE)
+
+
+def file_version(path):
+    # (mtime, size) of a data file, (0, 0) if it doesn't exist; used to tell when to re-read it
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (0, 0)
+
+
+def jobs_version():
+    # Changes whenever the agent appends to the log or rewrites the snapshot
+    return file_version(JOBS_PATH) + file_version(JOBS_LOG_PATH)
+
+
+def _build_token():
+    # Identifies this version of the app (its code and dashboard template), so a deploy or
+    # restart with changes invalidates ETags even when the job files are unchanged
+    h = hashlib.blake2b(TEMPLATE.encode('utf-8'), digest_size=8)
+    try:
+        with open(os.path.abspath(__file__), 'rb') as f:
+            h.update(f.read())
+    except OSError:
+        pass
+    return h.hexdigest()
+
+
+BUILD_TOKEN = _build_token()
+
+
+def page_version():
+    # The dashboard depends on the job files and on the static files it links (by content hash)
+    version = jobs_version()
+    for filename in DASHBOARD_ASSETS:
+        version += file_version(os.path.join(app.static_folder, filename))
+    return version
+
+
+def version_etag(version):
+    # ETag for responses derived from the job files
+    return BUILD_TOKEN + '-' + '-'.join(str(v) for v in version)
+
+
+# Parsed job and settings files, keyed by the file version they were read from
+_jobs_cache = (None, None)
+_settings_cache = (None, None, None)
 
 
 def load_jobs():
-    data_path = os.path.join(os.getcwd(), 'data', 'jobs.json')
+    # Saved jobs live in the data/jobs.json snapshot plus the data/jobs.ndjson log of jobs
+    # appended since the agent last compacted it (one JSON object per line)
+    global _jobs_cache
+    version = jobs_version()
+    cached_version, cached_jobs = _jobs_cache
+    if cached_version == version:
+        return list(cached_jobs)
+
+    failed = False
+    jobs = []
     try:
-        if not os.path.exists(data_path):
-            return []
-        with open(data_path, 'r', encoding='utf-8') as f:
-            jobs = json.load(f) or []
-            return jobs
+        with open(JOBS_PATH, 'rb') as f:
+            data = f.read()
+        # An empty file (e.g. one just created by hand) means no jobs, not an error
+        jobs = (json_loads(data) if data.strip() else None) or []
+    except FileNotFoundError:
+        pass
     except Exception as e:
         # Fail safe: don't crash the web server if file is invalid
         print(f"Error loading jobs for web UI: {e}")
-        return []
+        failed = True
+        jobs = []
+
+    try:
+        with open(JOBS_LOG_PATH, 'rb') as f:
+            seen = {j.get('id') for j in jobs}
+            for line in f:
+                try:
+                    j = json_loads(line)
+                except ValueError:
+                    # Blank or partially written line
+                    continue
+                if j.get('id') not in seen:
+                    seen.add(j.get('id'))
+                    jobs.append(j)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading jobs for web UI: {e}")
+        failed = True
+
+    if not failed:
+        _jobs_cache = (version, jobs)
+    return list(jobs)
 
 
 # Settings helpers: load/save settings to data/settings.json with safe defaults
@@ -94,67 +238,142 @@ DEFAULT_SETTINGS = {
 
 
 def load_settings():
-    path = os.path.join(os.getcwd(), 'data', 'settings.json')
+    global _settings_cache
     try:
-        if not os.path.exists(path):
+        version = file_version(SETTINGS_PATH)
+        cached_version, cached_settings, _ = _settings_cache
+        if cached_version == version:
+            return dict(cached_settings)
+
+        try:
+            with open(SETTINGS_PATH, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
             # Create file with defaults
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(DEFAULT_SETTINGS, f, ensure_ascii=False, indent=2)
+            os.makedirs(DATA_DIR, exist_ok=True)
+            write_atomic(SETTINGS_PATH, json_dumps(DEFAULT_SETTINGS))
             return DEFAULT_SETTINGS.copy()
-
-        with open(path, 'r', encoding='utf-8') as f:
-            s = json.load(f) or DEFAULT_SETTINGS.copy()
-            # Validate minimal structure
-            if not isinstance(s.get('search_terms'), list):
-                s['search_terms'] = DEFAULT_SETTINGS['search_terms']
-            if not isinstance(s.get('max_jobs'), int):
-                s['max_jobs'] = DEFAULT_SETTINGS['max_jobs']
-            return s
+        s = (json_loads(data) if data.strip() else None) or DEFAULT_SETTINGS.copy()
+        # Validate minimal structure
+        if not isinstance(s.get('search_terms'), list):
+            s['search_terms'] = DEFAULT_SETTINGS['search_terms']
+        if not isinstance(s.get('max_jobs'), int):
+            s['max_jobs'] = DEFAULT_SETTINGS['max_jobs']
+        _settings_cache = (version, s, data)
+        return dict(s)
     except Exception as e:
         print(f"Error loading settings: {e}")
         return DEFAULT_SETTINGS.copy()
 
 
+def write_atomic(path, data):
+    # Write to a uniquely named temporary file and rename it over the target, so neither a crash
+    # nor a concurrent save from another request thread can leave a partial file in place
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file owner-only; keep the usual permissions of a data file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 def save_settings(settings):
-    path = os.path.join(os.getcwd(), 'data', 'settings.json')
+    global _settings_cache
     try:
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
+        data = json_dumps(settings)
+        cached_version, _, cached_data = _settings_cache
+        if data == cached_data and cached_version == file_version(SETTINGS_PATH):
+            # Same content as the file on disk; re-submitting the form needs no write
+            return True
+        write_atomic(SETTINGS_PATH, data)
+        # Write-through: the next load_settings() doesn't need to read the file back
+        _settings_cache = (file_version(SETTINGS_PATH), dict(settings), data)
         return True
     except Exception as e:
         print(f"Error saving settings: {e}")
         return False
 
 
-@app.route('/')
-def index():
-    jobs = load_jobs()
+# Shared read-only stand-in for jobs saved without an evaluation
+NO_EVALUATION = MappingProxyType({})
 
-    # Normalize and sort: relevant first, then by score descending
-    def sort_key(j):
-        eval_ = j.get('evaluation', {})
-        relevant = bool(eval_.get('relevant'))
-        score = float(eval_.get('score') or 0.0)
-        # Sorting reversed later, so we return tuple
-        return (relevant, score)
+# Rendered dashboard, keyed by the version of the job files it was built from
+_page_cache = (None, None)
 
-    jobs_sorted = sorted(jobs, key=sort_key, reverse=True)
 
-    # Convert keys to attributes-like for template simplicity
-    class J:
-        def __init__(self, d):
-            self.__dict__.update(d)
-            # ensure evaluation is an object with attributes
-            ev = d.get('evaluation', {})
-            class E: pass
-            e = E()
-            e.__dict__.update(ev)
-            self.evaluation = e
+def render_and_cache(chunks, version):
+    # Pass rendered chunks through to the client, then cache the complete page
+    global _page_cache
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    _page_cache = (version, ''.join(parts))
 
-    jobs_wrapped = [J(j) for j in jobs_sorted]
 
-    return render_template_string(TEMPLATE, jobs=jobs_wrapped)
+@app.route('/')
+def index():
+    version = page_version()
+    cached_version, html = _page_cache
+    if html is None or cached_version != version:
+        # Copies, so the view fields below don't end up in the cached jobs served by /jobs.json
+        jobs = [dict(j) for j in load_jobs()]
+        for j in jobs:
+            # The template reads job.evaluation.*; make sure every job has one
+            if not isinstance(j.get('evaluation'), dict):
+                j['evaluation'] = NO_EVALUATION
+
+            # Normalize the sort key and display values once per change of the job files
+            eval_ = j['evaluation']
+            try:
+                score = float(eval_.get('score') or 0.0)
+            except (TypeError, ValueError):
+                score = 0.0
+            j['_relevant'] = bool(eval_.get('relevant'))
+            j['_score'] = score
+            j['_score_str'] = f"{score:.2f}"
+
+        # Relevant first, then by score descending
+        jobs_sorted = sorted(jobs, key=itemgetter('_relevant', '_score'), reverse=True)
+
+        # Stream the page while rendering it and keep the result for the next requests.
+        # Jinja falls back to item lookup, so job.url etc. work on the dicts directly
+        resp = Response(render_and_cache(stream_template(INDEX_TEMPLATE, jobs=jobs_sorted), version), mimetype='text/html')
+    else:
+        resp = Response(html, mimetype='text/html')
+
+    # Browsers revalidate on every visit and get a 304 until the job files change
+    resp.set_etag(version_etag(version))
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+
+# Serialized /jobs.json body, keyed like the page cache
+_jobs_json_cache = (None, None)
+
+
+@app.route('/jobs.json')
+def jobs_json():
+    # All saved jobs (snapshot and log merged) for scripts and other clients, with the same
+    # ETag revalidation as the dashboard
+    global _jobs_json_cache
+    version = jobs_version()
+    cached_version, body = _jobs_json_cache
+    if body is None or cached_version != version:
+        body = json_dumps(load_jobs())
+        _jobs_json_cache = (version, body)
+
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(version_etag(version))
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
 
 
 # Settings page: view and edit settings
@@ -204,6 +423,17 @@ SETTINGS_TEMPLATE = """
 </html>
 """
 
+SETTINGS_PAGE_TEMPLATE = app.jinja_env.from_string(SETTINGS_TEMPLATE)
+
+
+# Query-string values that count as "yes" (e.g. ?saved=1 after the settings form redirects)
+TRUTHY = frozenset({'1', 'true', 'True', 'yes'})
+
+
+def form_lines(text):
+    # One entry per non-blank textarea line, trimmed; each line is stripped only once
+    return [line for line in (s.strip() for s in text.splitlines()) if line]
+
 
 @app.route('/settings', methods=['GET', 'POST'])
 def settings():
@@ -215,9 +445,9 @@ def settings():
         max_jobs = request.form.get('max_jobs', '')
 
         settings = {}
-        settings['search_terms'] = [s.strip() for s in search.splitlines() if s.strip()]
-        settings['include_titles'] = [s.strip() for s in include.splitlines() if s.strip()]
-        settings['exclude_titles'] = [s.strip() for s in exclude.splitlines() if s.strip()]
+        settings['search_terms'] = form_lines(search)
+        settings['include_titles'] = form_lines(include)
+        settings['exclude_titles'] = form_lines(exclude)
         try:
             settings['max_jobs'] = int(max_jobs)
         except Exception:
@@ -234,24 +464,84 @@ def settings():
     exclude_titles = "\n".join(s.get('exclude_titles', []))
     max_jobs = s.get('max_jobs', DEFAULT_SETTINGS['max_jobs'])
 
-    saved = request.args.get('saved') == '1' or request.args.get('saved') == 'True' or False
+    saved = request.args.get('saved', '') in TRUTHY
 
-    return render_template_string(SETTINGS_TEMPLATE, search_terms=search_terms, include_titles=include_titles, exclude_titles=exclude_titles, max_jobs=max_jobs, saved=saved)
+    return render_template(SETTINGS_PAGE_TEMPLATE, search_terms=search_terms, include_titles=include_titles, exclude_titles=exclude_titles, max_jobs=max_jobs, saved=saved)
 
 
-@app.route('/update', methods=['POST'])
-def update():
-    # Trigger the job agent via subprocess when the user requests an update
+# The agent run started from the web UI (if any); guarded so only one runs at a time
+_update_lock = threading.Lock()
+_update_thread = None
+_update_error = None
+
+
+def update_running():
+    return _update_thread is not None and _update_thread.is_alive()
+
+
+def run_update():
+    # Runs the agent in this process, so its modules, HTTP sessions and caches stay warm between runs
+    global _update_error
     try:
-        print('Update triggered by web UI', file=sys.stderr)
-        # Run agent; do not raise on non-zero exit to avoid crashing the web server
-        subprocess.run(["python", "src/run.py"], check=False)
+        # Imported on first use, so the UI itself starts without the agent's dependencies;
+        # later runs reuse the already imported module
+        if AGENT_DIR not in sys.path:
+            sys.path.insert(0, AGENT_DIR)
+        import run as agent
+
+        # Pick up edits to evaluate_job.mcp made while the server was running
+        agent._mcp_system_prompt.cache_clear()
+        asyncio.run(agent.main())
+        _update_error = None
     except Exception as e:
         print(f"Error running update: {e}", file=sys.stderr)
+        _update_error = str(e)
+
+
+@app.route('/update', methods=['POST'])
+def update():
+    # Start the job agent in the background and return right away; a run can take minutes
+    global _update_thread
+    with _update_lock:
+        if update_running():
+            return "Opdatering kører allerede", 409
+        print('Update triggered by web UI', file=sys.stderr)
+        _update_thread = threading.Thread(target=run_update, name='jobhunter-update', daemon=True)
+        _update_thread.start()
 
     return redirect(url_for('index'))
 
 
+@app.route('/status')
+def status():
+    # Lets the UI (or curl) check whether an update started via /update is still running
+    with _update_lock:
+        running = update_running()
+    return jsonify(running=running, error=None if running else _update_error)
+
+
+def warm_up():
+    # Load the data files and render the dashboard once at startup, so the first visitor
+    # doesn't pay for parsing and the first render
+    try:
+        load_settings()
+        with app.test_request_context('/'):
+            resp = index()
+            for _ in resp.response:
+                pass
+    except Exception as e:
+        print(f"Error warming up web UI: {e}", file=sys.stderr)
+
+
+warm_up()
+
+
 if __name__ == '__main__':
-    # Run on 0.0.0.0:5500 as requested
-    app.run(host='0.0.0.0', port=5500)
+    # Run on 0.0.0.0:5500 as requested. The Docker image serves the app with gunicorn; when started
+    # directly, prefer waitress (threaded, keep-alive) if installed over Flask's development server.
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(host='0.0.0.0', port=5500, threaded=True)
+    else:
+        serve(app, host='0.0.0.0', port=5500, threads=8)